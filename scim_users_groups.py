@@ -1,100 +1,564 @@
 #!/usr/bin/env python3
-import requests
+# HTTP clients, asyncio and the JSON codec are imported inside the functions that use
+# them so that CLI start-up doesn't pay for modules the chosen action never touches
+from __future__ import annotations
 import argparse
-import json
-from typing import Dict, List, Optional
+from collections import OrderedDict, deque
+from functools import lru_cache
+from itertools import islice
+from operator import itemgetter
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Iterator, List, Optional, Tuple
 import sys
-import time
+import threading
+from time import monotonic
+from types import MappingProxyType
 
-def get_page(base_url: str, token: str, resource_type: str, start_index: int = 1, count: int = 1000) -> Dict:
-    """Retrieve a single page of resources (users or groups) from SCIM API"""
-    headers = {
-        'accept': 'application/scim+json;charset=utf-8',
-        'Authorization': f'Bearer {token}'
-    }
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+    import httpx
+
+# Shared client so every SCIM call is multiplexed over pooled HTTP/2 connections
+_client = None
+_client_lock = threading.Lock()
+
+# Per-verb request headers, built once and shared by every call
+_SCIM_JSON = 'application/scim+json;charset=utf-8'
+_H_JSON = MappingProxyType({'accept': _SCIM_JSON})
+_H_ANY = MappingProxyType({'accept': '*/*'})
+_H_WRITE = MappingProxyType({'accept': _SCIM_JSON, 'Content-Type': _SCIM_JSON})
+_H_PATCH = MappingProxyType({'accept': '*/*', 'Content-Type': _SCIM_JSON})
+
+# Static parts of request payloads, shared (never mutated) across calls
+_USER_SCHEMAS = (
+    "urn:ietf:params:scim:schemas:core:2.0:User",
+    "urn:ietf:params:scim:schemas:extension:enterprise:2.0:User",
+    "urn:ietf:params:scim:schemas:extension:tenant:2.0:User"
+)
+_GROUP_SCHEMAS = ("urn:ietf:params:scim:schemas:core:2.0:Group",)
+_PATCH_SCHEMAS = ("urn:ietf:params:scim:api:messages:2.0:PatchOp",)
+_LIST_SCHEMAS = ("urn:ietf:params:scim:api:messages:2.0:ListResponse",)
+
+@lru_cache(maxsize=None)
+def _scim_base(base_url: str) -> str:
+    """SCIM endpoint prefix for a tenant base URL, ending with a slash"""
+    return f"{base_url.rstrip('/')}/api/v2/scim/"
+
+def _accept_encoding() -> str:
+    """Content codings this client can decode; br needs brotli (or brotlicffi) installed for httpx"""
+    for module in ('brotli', 'brotlicffi'):
+        try:
+            __import__(module)
+        except ImportError:
+            continue
+        return 'gzip, deflate, br'
+    return 'gzip, deflate'
+
+def _new_client() -> httpx.Client:
+    """Build the pooled HTTP/2 client used by every synchronous SCIM call"""
+    import httpx
+    
+    # Connection-level retries only; 429/5xx responses are retried by _request_with_retry
+    transport = httpx.HTTPTransport(
+        http2=True,
+        limits=httpx.Limits(max_connections=10, max_keepalive_connections=10),
+        retries=3
+    )
+    # SCIM list pages are repetitive JSON and compress very well
+    return httpx.Client(
+        transport=transport,
+        timeout=DEFAULT_TIMEOUT,
+        follow_redirects=True,
+        headers={'Accept-Encoding': _accept_encoding()}
+    )
+
+def get_session(token: str) -> httpx.Client:
+    """Return the shared HTTP client, authorized with the given bearer token"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _new_client()
+    auth = f'Bearer {token}'
+    if _client.headers.get('Authorization') != auth:
+        _client.headers['Authorization'] = auth
+    return _client
+
+MAX_ATTEMPTS = 6
+MEMBERS_PER_PATCH = 500
+WRITE_BATCH = 1000
+DEFAULT_TIMEOUT = 30
+MAX_RETRY_AFTER = 120.0
+
+def _should_retry(status_code: int) -> bool:
+    """Whether a response status signals throttling or a transient server error"""
+    return status_code == 429 or status_code >= 500
+
+def _retry_delay(attempt: int, retry_after: Optional[str], base: float = 0.5, cap: float = 30.0,
+                 max_retry_after: float = MAX_RETRY_AFTER) -> float:
+    """Seconds to wait before the next attempt, preferring the server's Retry-After header
+    
+    A Retry-After that is not a finite number or date falls back to backoff, and
+    one longer than `max_retry_after` is clamped so a bad header can't stall the run.
+    """
+    import math
+    import random
+    
+    if retry_after:
+        delay = None
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            from datetime import datetime, timezone
+            from email.utils import parsedate_to_datetime
+            try:
+                delay = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                pass
+        if delay is not None and math.isfinite(delay):
+            return min(max(0.0, delay), max_retry_after)
+    # Exponential backoff with jitter so throttled clients don't retry in lockstep
+    return min(cap, base * 2 ** attempt) * random.uniform(0.5, 1.5)
+
+def _idempotency_key(payload: Dict, scope: str = '') -> str:
+    """Stable Idempotency-Key for a write, derived from its payload and target (e.g. the group ID)"""
+    import hashlib
+    import orjson
+    
+    return hashlib.sha1(scope.encode() + orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+def _request_with_retry(method: str, url: str, token: str, **kwargs) -> httpx.Response:
+    """Send a request, backing off and retrying on timeouts, connection errors, 429 and 5xx responses"""
+    import httpx
+    import time
+    
+    client = get_session(token)
+    if method != 'GET':
+        _page_cache.clear()
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            response = client.request(method, url, **kwargs)
+        except (httpx.TimeoutException, httpx.NetworkError) as e:
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+            delay = _retry_delay(attempt, None)
+            print(f"{method} {url} failed ({e}), retrying in {delay:.1f}s...", file=sys.stderr)
+            time.sleep(delay)
+            continue
+        if not _should_retry(response.status_code) or attempt == MAX_ATTEMPTS - 1:
+            return response
+        delay = _retry_delay(attempt, response.headers.get('Retry-After'))
+        print(f"{method} {url} returned {response.status_code}, retrying in {delay:.1f}s...", file=sys.stderr)
+        time.sleep(delay)
+    return response
+
+class PageCache:
+    """Thread-safe LRU of raw page bodies, capped at `max_bytes`, that expire `ttl` seconds after being fetched"""
+    
+    def __init__(self, max_bytes: int = 8 * 1024 * 1024, ttl: float = 60.0, enabled: bool = False):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.enabled = enabled
+        self._entries: 'OrderedDict[Tuple, Tuple[float, bytes]]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+    
+    def get(self, key: Tuple) -> Optional[bytes]:
+        """Return the cached body for `key`, or None if missing or expired"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                self._size -= len(entry[1])
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+    
+    def put(self, key: Tuple, content: bytes) -> None:
+        """Cache a page body, evicting the least recently used entries beyond `max_bytes`"""
+        if not self.enabled or len(content) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous[1])
+            self._entries[key] = (monotonic(), content)
+            self._size += len(content)
+            while self._size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+    
+    def clear(self) -> None:
+        """Drop every cached page"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+# Cached list pages, invalidated by any write so later listings see the change. Off by
+# default: a single CLI run never fetches a page twice, so caching would only pin memory
+_page_cache = PageCache()
+
+def enable_page_cache(max_bytes: int = 8 * 1024 * 1024, ttl: float = 60.0) -> None:
+    """Let library callers that repeat listings in one process reuse recently fetched pages"""
+    _page_cache.clear()
+    _page_cache.max_bytes = max_bytes
+    _page_cache.ttl = ttl
+    _page_cache.enabled = True
+
+def get_page(base_url: str, token: str, resource_type: str, start_index: int = 1, count: int = 1000,
+             filter_expr: Optional[str] = None) -> Dict:
+    """Retrieve a single page of resources (users or groups) from SCIM API, optionally only those
+    matching the SCIM `filter_expr`"""
+    import orjson
+    import httpx
     
     params = {
         'startIndex': start_index,
         'count': count
     }
+    if filter_expr:
+        params['filter'] = filter_expr
+    
+    key = (base_url, token, resource_type, start_index, count, filter_expr)
+    content = _page_cache.get(key)
+    if content is not None:
+        return orjson.loads(content)
     
     try:
-        response = requests.get(
-            f"{base_url.rstrip('/')}/api/v2/scim/{resource_type}",
-            headers=headers,
+        response = _request_with_retry(
+            'GET',
+            _scim_base(base_url) + resource_type,
+            token,
+            headers=_H_JSON,
             params=params
         )
         response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        page = orjson.loads(response.content)
+        _page_cache.put(key, response.content)
+        return page
+    except (httpx.HTTPError, orjson.JSONDecodeError) as e:
         print(f"Error retrieving {resource_type}: {e}", file=sys.stderr)
         sys.exit(1)
 
-def get_all_resources(base_url: str, token: str, resource_type: str) -> Dict:
-    """Retrieve all resources from SCIM API using pagination"""
-    first_page = get_page(base_url, token, resource_type)
+def iter_all_resources(base_url: str, token: str, resource_type: str, max_workers: int = 16,
+                       filter_expr: Optional[str] = None) -> Iterator[Dict]:
+    """Yield every resource from SCIM API, prefetching up to `max_workers` pages ahead in parallel"""
+    from concurrent.futures import ThreadPoolExecutor
+    
+    first_page = get_page(base_url, token, resource_type, filter_expr=filter_expr)
     total_results = first_page.get('totalResults', 0)
-    items_per_page = first_page.get('itemsPerPage', 1000)
+    items_per_page = first_page.get('itemsPerPage') or 1000
     
     print(f"Found {total_results} total {resource_type}, fetching all pages...", file=sys.stderr)
     
-    all_resources = first_page.get('Resources', [])
+    # totalResults is known after the first page, so fetch the rest concurrently while
+    # holding at most `max_workers` pages in memory
+    offsets = iter(range(items_per_page + 1, total_results + 1, items_per_page))
     
-    current_index = items_per_page + 1
-    while current_index <= total_results:
-        print(f"Fetching page starting at index {current_index}...", file=sys.stderr)
-        page = get_page(base_url, token, resource_type, start_index=current_index)
-        all_resources.extend(page.get('Resources', []))
-        current_index += items_per_page
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        def submit(offset: int) -> Future:
+            print(f"Fetching page starting at index {offset}...", file=sys.stderr)
+            return executor.submit(get_page, base_url, token, resource_type, start_index=offset,
+                                   filter_expr=filter_expr)
+        
+        pending = deque(submit(offset) for offset in islice(offsets, max_workers))
+        yield from first_page.pop('Resources', [])
+        while pending:
+            page = pending.popleft().result()
+            pending.extend(submit(offset) for offset in islice(offsets, 1))
+            yield from page.get('Resources', [])
+
+def get_all_resources(base_url: str, token: str, resource_type: str, max_workers: int = 16,
+                      filter_expr: Optional[str] = None) -> Dict:
+    """Retrieve all resources from SCIM API as a single list response"""
+    all_resources = list(iter_all_resources(base_url, token, resource_type, max_workers, filter_expr=filter_expr))
     
     return {
-        "schemas": first_page.get('schemas', []),
-        "totalResults": total_results,
+        "schemas": list(_LIST_SCHEMAS),
+        "totalResults": len(all_resources),
         "Resources": all_resources,
         "itemsPerPage": len(all_resources),
         "startIndex": 1
     }
 
+def build_filter(raw: Optional[str] = None, username_eq: Optional[str] = None,
+                 display_name_sw: Optional[str] = None) -> Optional[str]:
+    """Combine a raw SCIM filter and the attribute shortcuts into one filter expression"""
+    def literal(value: str) -> str:
+        return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+    
+    clauses = []
+    if raw:
+        clauses.append(f"({raw})")
+    if username_eq:
+        clauses.append(f"userName eq {literal(username_eq)}")
+    if display_name_sw:
+        clauses.append(f"displayName sw {literal(display_name_sw)}")
+    return ' and '.join(clauses) or None
+
 def delete_resource(base_url: str, token: str, resource_type: str, resource_id: str) -> bool:
     """Delete a single resource by ID"""
-    headers = {
-        'accept': '*/*',
-        'Authorization': f'Bearer {token}'
-    }
+    import httpx
     
     try:
-        response = requests.delete(
-            f"{base_url.rstrip('/')}/api/v2/scim/{resource_type}/{resource_id}",
-            headers=headers
+        response = _request_with_retry(
+            'DELETE',
+            f"{_scim_base(base_url)}{resource_type}/{resource_id}",
+            token,
+            headers=_H_ANY
         )
         response.raise_for_status()
         return True
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"Error deleting {resource_type} {resource_id}: {e}", file=sys.stderr)
         return False
 
-def delete_resources(base_url: str, token: str, resource_type: str, resource_ids: List[str], delay: float = 0.5) -> Dict[str, bool]:
-    """Delete multiple resources with delay between requests"""
+class TokenBucket:
+    """Token-bucket rate limiter allowing `rate` requests per second with bursts of up to `capacity`"""
+    
+    def __init__(self, rate: float, capacity: float = 1.0):
+        import asyncio
+        
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = monotonic()
+        self._lock = asyncio.Lock()
+    
+    def _refill(self) -> None:
+        now = monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    async def acquire(self) -> None:
+        """Consume one token, sleeping only when the bucket is empty"""
+        import asyncio
+        
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+class AdmissionController:
+    """Client-side AIMD concurrency limit driven by the 429 rate of recent responses
+    
+    Every round of `limit` completions without a 429 admits one more request in
+    flight; a round containing any 429 shrinks the limit by 30%. The token bucket,
+    if any, is scaled to the same fraction of its configured rate.
+    """
+    
+    def __init__(self, max_limit: int, bucket: Optional[TokenBucket] = None, window: int = 200):
+        import asyncio
+        
+        if not isinstance(max_limit, int) or max_limit < 1:
+            raise ValueError(f"concurrency must be an integer of at least 1, got {max_limit!r}")
+        self.max_limit = max_limit
+        self.limit = float(max_limit)
+        self.bucket = bucket
+        self._max_rate = bucket.rate if bucket else 0.0
+        self._recent = deque(maxlen=window)
+        self._in_flight = 0
+        self._round = 0
+        self._throttled = False
+        self._cond = asyncio.Condition()
+    
+    @property
+    def p429(self) -> float:
+        """Fraction of 429 responses over the rolling window"""
+        return self._recent.count(429) / len(self._recent) if self._recent else 0.0
+    
+    async def __aenter__(self) -> 'AdmissionController':
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < int(self.limit))
+            self._in_flight += 1
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        async with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+    
+    def record(self, status_code: int) -> None:
+        """Record a response status and adjust the limit at the end of each round"""
+        self._recent.append(status_code)
+        self._throttled = self._throttled or status_code == 429
+        self._round += 1
+        if self._round < int(self.limit):
+            return
+        
+        if self._throttled:
+            self.limit = max(1.0, self.limit * 0.7)
+            print(f"Throttled (429 rate {self.p429:.1%}), reducing concurrency to {int(self.limit)}", file=sys.stderr)
+        else:
+            self.limit = min(float(self.max_limit), self.limit + 1)
+        self._round = 0
+        self._throttled = False
+        if self.bucket:
+            self.bucket.rate = self._max_rate * self.limit / self.max_limit
+
+async def _arequest_with_retry(client: httpx.AsyncClient, bucket: Optional[TokenBucket], method: str, url: str,
+                               admission: Optional[AdmissionController] = None, **kwargs) -> httpx.Response:
+    """Async counterpart of _request_with_retry, paced by `bucket` and reporting statuses to `admission`"""
+    import asyncio
+    import httpx
+    
+    for attempt in range(MAX_ATTEMPTS):
+        if bucket:
+            await bucket.acquire()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except (httpx.TimeoutException, httpx.NetworkError) as e:
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+            delay = _retry_delay(attempt, None)
+            print(f"{method} {url} failed ({e}), retrying in {delay:.1f}s...", file=sys.stderr)
+            await asyncio.sleep(delay)
+            continue
+        if admission:
+            admission.record(response.status_code)
+        if not _should_retry(response.status_code) or attempt == MAX_ATTEMPTS - 1:
+            return response
+        delay = _retry_delay(attempt, response.headers.get('Retry-After'))
+        print(f"{method} {url} returned {response.status_code}, retrying in {delay:.1f}s...", file=sys.stderr)
+        await asyncio.sleep(delay)
+    return response
+
+async def _delete_one(client: httpx.AsyncClient, admission: AdmissionController, bucket: Optional[TokenBucket],
+                      url: str, resource_id: str) -> Tuple[str, bool]:
+    """Delete a single resource once admitted and a rate token is free"""
+    import httpx
+    
+    async with admission:
+        try:
+            response = await _arequest_with_retry(client, bucket, 'DELETE', url, admission)
+            response.raise_for_status()
+            return resource_id, True
+        except httpx.HTTPError as e:
+            print(f"Error deleting {url}: {e}", file=sys.stderr)
+            return resource_id, False
+
+def _new_async_client(token: str, concurrency: int) -> httpx.AsyncClient:
+    """Build a pooled HTTP/2 client for one run of concurrent SCIM calls"""
+    import httpx
+    
+    transport = httpx.AsyncHTTPTransport(
+        http2=True,
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency, keepalive_expiry=30),
+        retries=3
+    )
+    headers = {**_H_ANY, 'Authorization': f'Bearer {token}', 'Accept-Encoding': _accept_encoding()}
+    return httpx.AsyncClient(transport=transport, headers=headers, timeout=DEFAULT_TIMEOUT, follow_redirects=True)
+
+async def _aget_page(client: httpx.AsyncClient, bucket: Optional[TokenBucket], url: str, params: Dict) -> Dict:
+    """Fetch one list page asynchronously"""
+    import orjson
+    
+    response = await _arequest_with_retry(client, bucket, 'GET', url, headers=_H_JSON, params=params)
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+async def aiter_id_pages(client: httpx.AsyncClient, bucket: Optional[TokenBucket], base_url: str, resource_type: str,
+                         filter_expr: Optional[str] = None, count: int = 1000) -> AsyncIterator[Tuple[int, List[str]]]:
+    """Yield (totalResults, page IDs) for all (or all matching) resources a page at a time, last page first
+    
+    Walking backwards keeps the listing stable while the yielded resources are being
+    deleted: removing a page only shifts the indexes after it, which were already read.
+    """
+    url = _scim_base(base_url) + resource_type
+    params = {'startIndex': 1, 'count': count, 'attributes': 'id'}
+    if filter_expr:
+        params['filter'] = filter_expr
+    
+    first_page = await _aget_page(client, bucket, url, params)
+    total_results = first_page.get('totalResults', 0)
+    items_per_page = first_page.get('itemsPerPage') or count
+    
+    print(f"Found {total_results} total {resource_type}, fetching all pages...", file=sys.stderr)
+    
+    for offset in reversed(range(items_per_page + 1, total_results + 1, items_per_page)):
+        print(f"Fetching page starting at index {offset}...", file=sys.stderr)
+        page = await _aget_page(client, bucket, url, {**params, 'startIndex': offset})
+        yield total_results, [resource['id'] for resource in page.get('Resources', [])]
+    yield total_results, [resource['id'] for resource in first_page.get('Resources', [])]
+
+async def _delete_async(base_url: str, token: str, resource_type: str, resource_ids: Optional[List[str]],
+                        filter_expr: Optional[str], concurrency: int, rate: float) -> Dict[str, bool]:
+    """Delete `resource_ids`, or every (matching) resource when None, through a pool of delete workers
+    
+    When listing, fetched pages are deleted while later ones are still being fetched.
+    """
+    import asyncio
+    import httpx
+    import orjson
+    
+    base = _scim_base(base_url) + resource_type
+    bucket = TokenBucket(rate) if rate > 0 else None
+    _page_cache.clear()
+    admission = AdmissionController(concurrency, bucket)
+    # Buffer at most 1000 IDs (one default-size page) ahead of the delete workers
+    queue = asyncio.Queue(maxsize=1000)
     results = {}
-    total = len(resource_ids)
+    total = len(resource_ids) if resource_ids is not None else 0
     
-    for i, resource_id in enumerate(resource_ids, 1):
-        print(f"Deleting {resource_type} {i}/{total} (ID: {resource_id})...", file=sys.stderr)
-        success = delete_resource(base_url, token, resource_type, resource_id)
-        results[resource_id] = success
-        if i < total:  # Don't sleep after the last request
-            time.sleep(delay)
+    async def delete_worker(client: httpx.AsyncClient) -> None:
+        while True:
+            resource_id = await queue.get()
+            success = False
+            try:
+                _, success = await _delete_one(client, admission, bucket, f"{base}/{resource_id}", resource_id)
+            except Exception as e:
+                # Keep the worker alive so queue.join() can still complete
+                print(f"Error deleting {resource_type} {resource_id}: {e}", file=sys.stderr)
+            finally:
+                results[resource_id] = success
+                print(f"Deleted {resource_type} {len(results)}/{total} (ID: {resource_id})...", file=sys.stderr)
+                queue.task_done()
+    
+    async with _new_async_client(token, concurrency) as client:
+        workers = [asyncio.create_task(delete_worker(client)) for _ in range(concurrency)]
+        try:
+            if resource_ids is not None:
+                for resource_id in resource_ids:
+                    await queue.put(resource_id)
+            else:
+                async for total, page_ids in aiter_id_pages(client, bucket, base_url, resource_type, filter_expr):
+                    for resource_id in page_ids:
+                        await queue.put(resource_id)
+        except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+            print(f"Error retrieving {resource_type}: {e}", file=sys.stderr)
+            sys.exit(1)
+        await queue.join()
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
     
     return results
 
+def delete_resources(base_url: str, token: str, resource_type: str, resource_ids: List[str], *,
+                     concurrency: int = 40, rate: float = 48.0) -> Dict[str, bool]:
+    """Delete multiple resources with up to `concurrency` requests in flight, paced at `rate` requests per second"""
+    import asyncio
+    
+    return asyncio.run(_delete_async(base_url, token, resource_type, resource_ids, None, concurrency, rate))
+
+def delete_all_resources(base_url: str, token: str, resource_type: str, filter_expr: Optional[str] = None, *,
+                         concurrency: int = 40, rate: float = 48.0) -> Dict[str, bool]:
+    """Delete every resource (or every one matching `filter_expr`), pipelining page fetches with deletes"""
+    import asyncio
+    
+    return asyncio.run(_delete_async(base_url, token, resource_type, None, filter_expr, concurrency, rate))
+
 def create_user(base_url: str, token: str, username: str, email: str, 
-                first_name: str, last_name: str, external_id: Optional[str] = None) -> Dict:
+                first_name: str, last_name: str, external_id: Optional[str] = None,
+                idempotency_key: Optional[str] = None) -> Dict:
     """Create a new user via SCIM API"""
-    headers = {
-        'accept': 'application/scim+json;charset=utf-8',
-        'Authorization': f'Bearer {token}',
-        'Content-Type': 'application/scim+json;charset=utf-8'
-    }
+    import orjson
+    import httpx
     
     payload = {
         "active": True,
@@ -112,36 +576,34 @@ def create_user(base_url: str, token: str, username: str, email: str,
             "familyName": last_name,
             "givenName": first_name
         },
-        "schemas": [
-            "urn:ietf:params:scim:schemas:core:2.0:User",
-            "urn:ietf:params:scim:schemas:extension:enterprise:2.0:User",
-            "urn:ietf:params:scim:schemas:extension:tenant:2.0:User"
-        ],
+        "schemas": _USER_SCHEMAS,
         "userName": username
     }
     
+    headers = {**_H_WRITE, 'Idempotency-Key': idempotency_key or _idempotency_key(payload)}
+    
     try:
-        response = requests.post(
-            f"{base_url.rstrip('/')}/api/v2/scim/Users",
+        response = _request_with_retry(
+            'POST',
+            _scim_base(base_url) + 'Users',
+            token,
             headers=headers,
-            json=payload
+            content=orjson.dumps(payload)
         )
         response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        return orjson.loads(response.content)
+    except (httpx.HTTPError, orjson.JSONDecodeError) as e:
         print(f"Error creating user: {e}", file=sys.stderr)
-        if hasattr(e.response, 'text'):
+        if hasattr(getattr(e, 'response', None), 'text'):
             print(f"Response: {e.response.text}", file=sys.stderr)
         sys.exit(1)
 
 def create_group(base_url: str, token: str, display_name: str, 
-                external_id: Optional[str] = None, member_ids: Optional[List[str]] = None) -> Dict:
+                external_id: Optional[str] = None, member_ids: Optional[List[str]] = None,
+                idempotency_key: Optional[str] = None) -> Dict:
     """Create a new group via SCIM API"""
-    headers = {
-        'accept': 'application/scim+json;charset=utf-8',
-        'Authorization': f'Bearer {token}',
-        'Content-Type': 'application/scim+json;charset=utf-8'
-    }
+    import orjson
+    import httpx
     
     payload = {
         "displayName": display_name,
@@ -149,99 +611,144 @@ def create_group(base_url: str, token: str, display_name: str,
         "meta": {
             "resourceType": "Group"
         },
-        "schemas": [
-            "urn:ietf:params:scim:schemas:core:2.0:Group"
-        ]
+        "schemas": _GROUP_SCHEMAS
     }
     
     if member_ids:
         payload["members"] = [{"value": member_id} for member_id in member_ids]
     
+    headers = {**_H_WRITE, 'Idempotency-Key': idempotency_key or _idempotency_key(payload)}
+    
     try:
-        response = requests.post(
-            f"{base_url.rstrip('/')}/api/v2/scim/Groups",
+        response = _request_with_retry(
+            'POST',
+            _scim_base(base_url) + 'Groups',
+            token,
             headers=headers,
-            json=payload
+            content=orjson.dumps(payload)
         )
         response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        return orjson.loads(response.content)
+    except (httpx.HTTPError, orjson.JSONDecodeError) as e:
         print(f"Error creating group: {e}", file=sys.stderr)
-        if hasattr(e.response, 'text'):
+        if hasattr(getattr(e, 'response', None), 'text'):
             print(f"Response: {e.response.text}", file=sys.stderr)
         sys.exit(1)
 
-def add_user_to_group(base_url: str, token: str, group_id: str, user_id: str) -> bool:
-    """Add a user to a group via SCIM PATCH operation"""
-    headers = {
-        'accept': '*/*',
-        'Authorization': f'Bearer {token}',
-        'Content-Type': 'application/scim+json;charset=utf-8'
-    }
+def add_users_to_group(base_url: str, token: str, group_id: str, user_ids: List[str],
+                       idempotency_key: Optional[str] = None) -> bool:
+    """Add several users to a group with a single SCIM PATCH operation"""
+    import orjson
+    import httpx
     
     payload = {
-        "schemas": [
-            "urn:ietf:params:scim:api:messages:2.0:PatchOp"
-        ],
+        "schemas": _PATCH_SCHEMAS,
         "Operations": [
             {
                 "op": "add",
                 "path": "members",
-                "value": {
-                    "value": {
-                        "value": user_id
-                    }
-                }
+                "value": [{"value": user_id} for user_id in user_ids]
             }
         ]
     }
     
+    headers = {**_H_PATCH, 'Idempotency-Key': idempotency_key or _idempotency_key(payload, group_id)}
+    
     try:
-        response = requests.patch(
-            f"{base_url.rstrip('/')}/api/v2/scim/Groups/{group_id}",
+        response = _request_with_retry(
+            'PATCH',
+            _scim_base(base_url) + 'Groups/' + group_id,
+            token,
             headers=headers,
-            json=payload
+            content=orjson.dumps(payload)
         )
         response.raise_for_status()
         return True
-    except requests.exceptions.RequestException as e:
-        print(f"Error adding user to group: {e}", file=sys.stderr)
-        if hasattr(e.response, 'text'):
+    except httpx.HTTPError as e:
+        print(f"Error adding users to group: {e}", file=sys.stderr)
+        if hasattr(getattr(e, 'response', None), 'text'):
             print(f"Response: {e.response.text}", file=sys.stderr)
         return False
 
+def add_user_to_group(base_url: str, token: str, group_id: str, user_id: str,
+                      idempotency_key: Optional[str] = None) -> bool:
+    """Add a user to a group via SCIM PATCH operation"""
+    return add_users_to_group(base_url, token, group_id, [user_id], idempotency_key)
+
+_user_fields = itemgetter('userName', 'id', 'name', 'active', 'emails')
+_group_fields = itemgetter('displayName', 'id', 'meta', 'externalId')
+
 def format_user(user: Dict) -> str:
     """Format user details for display"""
-    return (
-        f"Username: {user.get('userName', 'N/A')}\n"
-        f"ID: {user.get('id', 'N/A')}\n"
-        f"Name: {user.get('name', {}).get('givenName', 'N/A')} {user.get('name', {}).get('familyName', 'N/A')}\n"
-        f"Status: {user.get('active', False)}\n"
-        f"Email: {user.get('emails', [{'value': 'N/A'}])[0]['value']}"
-    )
+    try:
+        username, user_id, name, active, emails = _user_fields(user)
+        given_name, family_name = name['givenName'], name['familyName']
+        email = emails[0]['value']
+    except (KeyError, IndexError, TypeError):
+        # Sparse record: fall back to per-field defaults
+        name = user.get('name') or {}
+        emails = user.get('emails') or [{}]
+        username, user_id, active = user.get('userName', 'N/A'), user.get('id', 'N/A'), user.get('active', False)
+        given_name, family_name = name.get('givenName', 'N/A'), name.get('familyName', 'N/A')
+        email = emails[0].get('value', 'N/A')
+    return '\n'.join((
+        f"Username: {username}",
+        f"ID: {user_id}",
+        f"Name: {given_name} {family_name}",
+        f"Status: {active}",
+        f"Email: {email}"
+    ))
 
 def format_group(group: Dict) -> str:
     """Format group details for display"""
-    return (
-        f"Display Name: {group.get('displayName', 'N/A')}\n"
-        f"ID: {group.get('id', 'N/A')}\n"
-        f"Last Modified: {group.get('meta', {}).get('lastModified', 'N/A')}\n"
-        f"External ID: {group.get('externalId', 'N/A')}"
-    )
+    try:
+        display_name, group_id, meta, external_id = _group_fields(group)
+        last_modified = meta['lastModified']
+    except (KeyError, TypeError):
+        # Sparse record: fall back to per-field defaults
+        display_name, group_id = group.get('displayName', 'N/A'), group.get('id', 'N/A')
+        last_modified = (group.get('meta') or {}).get('lastModified', 'N/A')
+        external_id = group.get('externalId', 'N/A')
+    return '\n'.join((
+        f"Display Name: {display_name}",
+        f"ID: {group_id}",
+        f"Last Modified: {last_modified}",
+        f"External ID: {external_id}"
+    ))
+
+def _positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
 
 def main():
+    import orjson
+    
     parser = argparse.ArgumentParser(description='SCIM User and Group Management CLI Tool')
     parser.add_argument('--url', required=True, help='Base URL of the SCIM API')
     parser.add_argument('--token', required=True, help='Bearer token for authentication')
-    parser.add_argument('--format', choices=['pretty', 'json'], default='pretty',
-                       help='Output format (default: pretty)')
+    parser.add_argument('--format', choices=['pretty', 'json', 'jsonl'], default='pretty',
+                       help='Output format; jsonl streams one compact JSON document per line (default: pretty)')
     parser.add_argument('--type', choices=['Users', 'Groups'], 
                        help='Resource type to manage (required for list/delete operations)')
     parser.add_argument('--action', choices=['list', 'delete', 'create'], default='list',
                        help='Action to perform (default: list)')
     parser.add_argument('--id', help='Specific resource ID to delete')
-    parser.add_argument('--delay', type=float, default=0.5,
-                       help='Delay between delete requests in seconds (default: 0.5)')
+    
+    # Server-side filtering for list and delete operations
+    parser.add_argument('--filter', help='Raw SCIM filter expression, e.g. \'userName sw "test"\'')
+    parser.add_argument('--username-eq', help='Only Users whose userName equals this value')
+    parser.add_argument('--display-name-sw', help='Only resources whose displayName starts with this value')
+    
+    parser.add_argument('--concurrency', type=_positive_int, default=40,
+                       help='Maximum concurrent delete requests (default: 40)')
+    parser.add_argument('--rate', type=float, default=48.0,
+                       help='Maximum delete requests per second, 0 to disable (default: 48)')
     
     # User creation parameters
     parser.add_argument('--username', help='Username for new user')
@@ -252,7 +759,8 @@ def main():
     # Group creation parameters
     parser.add_argument('--display-name', help='Display name for new group')
     parser.add_argument('--external-id', help='External ID for new user or group')
-    parser.add_argument('--members', help='Comma-separated list of member IDs for new group')
+    parser.add_argument('--members',
+                       help='Comma-separated list of member IDs for new group or --add-to-group')
     
     # Group membership parameters
     parser.add_argument('--add-to-group', action='store_true',
@@ -261,18 +769,27 @@ def main():
     parser.add_argument('--group-id', help='Group ID for group membership operations')
     
     args = parser.parse_args()
+    if args.username_eq and args.type == 'Groups':
+        parser.error("--username-eq only applies to --type Users")
+    if args.id and (args.filter or args.username_eq or args.display_name_sw):
+        parser.error("--id cannot be combined with --filter, --username-eq or --display-name-sw")
+    json_option = orjson.OPT_INDENT_2 if args.format == 'json' else 0
     
-    # Handle adding user to group
+    # Handle adding users to group
     if args.add_to_group:
-        if not all([args.user_id, args.group_id]):
-            print("Error: --user-id and --group-id are required for adding user to group")
+        if not args.group_id or not (args.user_id or args.members):
+            print("Error: --group-id and either --user-id or --members are required for adding users to group")
             sys.exit(1)
         
-        success = add_user_to_group(args.url, args.token, args.group_id, args.user_id)
-        if success:
-            print(f"Successfully added user {args.user_id} to group {args.group_id}")
-        else:
-            print(f"Failed to add user {args.user_id} to group {args.group_id}")
+        user_ids = args.members.split(',') if args.members else [args.user_id]
+        for i in range(0, len(user_ids), MEMBERS_PER_PATCH):
+            batch = user_ids[i:i + MEMBERS_PER_PATCH]
+            users = f"user {batch[0]}" if len(batch) == 1 else f"{len(batch)} users"
+            success = add_users_to_group(args.url, args.token, args.group_id, batch)
+            if success:
+                print(f"Successfully added {users} to group {args.group_id}")
+            else:
+                print(f"Failed to add {users} to group {args.group_id}")
         sys.exit(0)
     
     # Create operations
@@ -293,8 +810,8 @@ def main():
                 args.external_id
             )
             
-            if args.format == 'json':
-                print(json.dumps(user, indent=2))
+            if args.format != 'pretty':
+                print(orjson.dumps(user, option=json_option).decode())
             else:
                 print("User created successfully:")
                 print(format_user(user))
@@ -312,8 +829,8 @@ def main():
                 member_ids
             )
             
-            if args.format == 'json':
-                print(json.dumps(group, indent=2))
+            if args.format != 'pretty':
+                print(orjson.dumps(group, option=json_option).decode())
             else:
                 print("Group created successfully:")
                 print(format_group(group))
@@ -328,40 +845,78 @@ def main():
             print("Error: --type is required for list and delete operations")
             sys.exit(1)
         
+        filter_expr = build_filter(args.filter, args.username_eq, args.display_name_sw)
+        
         if args.action == 'delete' and not args.id:
-            confirm = input(f"No ID specified. This will delete ALL {args.type}. Are you sure? (yes/no): ")
+            if filter_expr:
+                prompt = f"No ID specified. This will delete ALL {args.type} matching {filter_expr}. Are you sure? (yes/no): "
+            else:
+                prompt = f"No ID specified. This will delete ALL {args.type}. Are you sure? (yes/no): "
+            if args.format == 'jsonl':
+                # Keep the prompt off stdout so the result stream stays valid JSON Lines
+                print(prompt, end='', file=sys.stderr, flush=True)
+                prompt = ''
+            confirm = input(prompt)
             if confirm.lower() != 'yes':
                 print("Operation cancelled.")
                 sys.exit(0)
         
         if args.action == 'list' or not args.id:
-            resources = get_all_resources(args.url, args.token, args.type)
-            
             if args.action == 'delete':
-                resource_ids = [resource['id'] for resource in resources['Resources']]
-                results = delete_resources(args.url, args.token, args.type, resource_ids, args.delay)
+                results = delete_all_resources(args.url, args.token, args.type, filter_expr,
+                                               concurrency=args.concurrency, rate=args.rate)
                 
                 successful = sum(1 for success in results.values() if success)
-                print(f"\nDeletion Summary:")
-                print(f"Successfully deleted: {successful}")
-                print(f"Failed to delete: {len(results) - successful}")
+                # jsonl keeps stdout machine-readable, so the summary goes to stderr
+                summary = sys.stderr if args.format == 'jsonl' else sys.stdout
+                print(f"\nDeletion Summary:", file=summary)
+                print(f"Successfully deleted: {successful}", file=summary)
+                print(f"Failed to delete: {len(results) - successful}", file=summary)
                 
                 if args.format == 'json':
-                    print(json.dumps(results, indent=2))
+                    print(orjson.dumps(results, option=json_option).decode())
+                elif args.format == 'jsonl':
+                    out = sys.stdout.buffer
+                    for resource_id, success in results.items():
+                        out.write(orjson.dumps({"id": resource_id, "deleted": success},
+                                               option=orjson.OPT_APPEND_NEWLINE))
+                    out.flush()
             else:  # list action
                 if args.format == 'json':
-                    print(json.dumps(resources, indent=2))
+                    resources = get_all_resources(args.url, args.token, args.type, filter_expr=filter_expr)
+                    print(orjson.dumps(resources, option=orjson.OPT_INDENT_2).decode())
+                elif args.format == 'jsonl':
+                    # One resource per line as it arrives, so output starts with the first page
+                    # and memory stays flat however many resources there are
+                    out = sys.stdout.buffer
+                    for found, resource in enumerate(iter_all_resources(args.url, args.token, args.type,
+                                                                        filter_expr=filter_expr), 1):
+                        out.write(orjson.dumps(resource, option=orjson.OPT_APPEND_NEWLINE))
+                        if found % WRITE_BATCH == 0:
+                            out.flush()
+                    out.flush()
                 else:
-                    print(f"Total {args.type} found: {len(resources['Resources'])}\n")
-                    for resource in resources['Resources']:
-                        if args.type == 'Users':
-                            print(format_user(resource))
-                        else:
-                            print(format_group(resource))
-                        print("-" * 40)
+                    # Collect formatted records and write them in large chunks rather than
+                    # issuing several print() calls per resource
+                    format_resource = format_user if args.type == 'Users' else format_group
+                    separator = "-" * 40
+                    lines = []
+                    found = 0
+                    for resource in iter_all_resources(args.url, args.token, args.type, filter_expr=filter_expr):
+                        lines.append(format_resource(resource))
+                        lines.append(separator)
+                        found += 1
+                        if found % WRITE_BATCH == 0:
+                            sys.stdout.write('\n'.join(lines) + '\n')
+                            lines.clear()
+                    lines.append(f"\nTotal {args.type} found: {found}")
+                    sys.stdout.write('\n'.join(lines) + '\n')
         else:  # Single resource deletion
             success = delete_resource(args.url, args.token, args.type, args.id)
-            print(f"{args.type[:-1]} {args.id} deletion: {'successful' if success else 'failed'}")
+            if args.format == 'jsonl':
+                print(orjson.dumps({"id": args.id, "deleted": success}).decode())
+            else:
+                print(f"{args.type[:-1]} {args.id} deletion: {'successful' if success else 'failed'}")
 
 if __name__ == "__main__":
     main()